@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 
-import argparse, subprocess, sys
+import argparse, os, string, subprocess, sys
 from pathlib import Path
+from typing import NoReturn
 
 SOLUTION_TEMPLATE = """//! Solution for Advent of Code 2023, Day {day}.
 //!
@@ -33,8 +34,11 @@ pub fn exec<P: AsRef<Path>>(_path: P) -> Result<()> {{
 }}
 """
 
+# parse the template once so rendering is just a join over the segments
+_TEMPLATE_PARTS = list(string.Formatter().parse(SOLUTION_TEMPLATE))
 
-def bail(msg: str, code=1):
+
+def bail(msg: str, code=1) -> NoReturn:
     print(f"error: {msg}")
     sys.exit(code)
 
@@ -46,80 +50,92 @@ def confirm(prompt: str | None = None):
     return choice == "y" or choice == "yes"
 
 
+def render(day: int, title: str) -> str:
+    fields = {"day": day, "title": title}
+    return "".join(
+        lit + (str(fields[field]) if field is not None else "")
+        for lit, field, _, _ in _TEMPLATE_PARTS
+    )
+
+
 def status(msg: str, level: int = 1):
     indent = "  " * level
     print(f"{indent}- {msg}")
 
 
 def update_file(path: Path, sentinel: str, before: str, value: str):
+    lines_in = path.read_text(encoding="utf-8").splitlines(keepends=True)
     lines = []
     found = False
-    with open(path, "r") as f:
-        for line in f:
-            s = line.strip()
-            if s.startswith(sentinel):
-                found = True
-            if found and s.startswith(before):
-                lines.append(value)
-            lines.append(line)
-
-    with open(path, "w", newline="\n") as f:
-        f.writelines(lines)
-
-
-parser = argparse.ArgumentParser(
-    description="Generate an Advent of Code rust module for the given day.",
-)
-parser.add_argument(
-    "-n",
-    "--num",
-    metavar="DAY",
-    dest="day",
-    type=int,
-    required=True,
-    help="the day number for this project",
-)
-parser.add_argument(
-    "-d",
-    "--parent-dir",
-    metavar="DIR",
-    type=str,
-    help="specify a different parent directory for the project (default: ../)",
-)
-parser.add_argument(
-    "-t",
-    "--title",
-    type=str,
-    help="optional title for the day's problem (used in documentation)",
-)
-parser.add_argument(
-    "--no-fmt",
-    action="store_true",
-    help="skip running `cargo fmt` after generating solution",
-)
+    for i, line in enumerate(lines_in):
+        s = line.lstrip()
+        if s.startswith(sentinel):
+            found = True
+        if found and s.startswith(before):
+            # only one insertion is needed, copy the rest of the file as-is
+            lines.append(value)
+            lines.extend(lines_in[i:])
+            break
+        lines.append(line)
+
+    path.write_text("".join(lines), encoding="utf-8", newline="\n")
 
 
 def validate_parent(path: Path):
-    if not path.exists() or not path.is_dir():
+    if not path.is_dir():
         bail(f"parent directory `{path.resolve()}` does not exist")
 
     expected_files = [path.joinpath("Cargo.lock"), path.joinpath("Cargo.toml")]
-    for f in expected_files:
-        if not f.exists():
-            bail(
-                "parent directory is not suitable\n"
-                f"  - expected to find `{f.name}` in `{f.parent.resolve()}`"
-            )
+    missing = next((f for f in expected_files if not f.exists()), None)
+    if missing is not None:
+        bail(
+            "parent directory is not suitable\n"
+            f"  - expected to find `{missing.name}` in `{path.resolve()}`"
+        )
 
 
 def run_command(args: list[str]):
-    status = subprocess.run(args, shell=True, check=False)
-    if status.returncode != 0:
-        bail(f"command `{' '.join(args)}` exited with status code {status}")
+    code = subprocess.call(args, stdin=subprocess.DEVNULL)
+    if code != 0:
+        bail(f"command `{' '.join(args)}` exited with status code {code}")
 
 
-if __name__ == "__main__":
-    args = parser.parse_args()
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Generate an Advent of Code rust module for the given day.",
+    )
+    parser.add_argument(
+        "-n",
+        "--num",
+        metavar="DAY",
+        dest="day",
+        type=int,
+        required=True,
+        help="the day number for this project",
+    )
+    parser.add_argument(
+        "-d",
+        "--parent-dir",
+        metavar="DIR",
+        type=str,
+        help="specify a different parent directory for the project (default: ../)",
+    )
+    parser.add_argument(
+        "-t",
+        "--title",
+        type=str,
+        help="optional title for the day's problem (used in documentation)",
+    )
+    parser.add_argument(
+        "--no-fmt",
+        action="store_true",
+        help="skip running `cargo fmt` after generating solution",
+    )
+    return parser
+
+
+def main():
+    args = _build_parser().parse_args()
 
     parent_dir = Path(args.parent_dir or "..")
     validate_parent(parent_dir)
@@ -128,14 +144,24 @@ if __name__ == "__main__":
     src_dir = parent_dir.joinpath("src")
     title = args.title or ""
     mod_name = f"day{day:02}"
-    mod_dir = src_dir.joinpath(f"solutions/{mod_name}")
+    solutions_dir = src_dir.joinpath("solutions")
+    mod_dir = solutions_dir.joinpath(mod_name)
     main_file = src_dir.joinpath(f"main.rs")
-    solution_mod = src_dir.joinpath(f"solutions/mod.rs")
+    solution_mod = solutions_dir.joinpath(f"mod.rs")
 
-    if src_dir.is_file():
+    # a single scan replaces separate stat calls for validating `src`
+    try:
+        with os.scandir(src_dir) as it:
+            entries = {e.name: e for e in it}
+    except NotADirectoryError:
         bail("`src` path exists and is not a directory")
-    if not src_dir.exists():
+    except FileNotFoundError:
         bail("`src` directory does not exist")
+    solutions_entry = entries.get("solutions")
+    if solutions_entry is None:
+        bail("`src/solutions` directory does not exist")
+    if not solutions_entry.is_dir():
+        bail("`src/solutions` path exists and is not a directory")
     if mod_dir.exists():
         print(f"WARNING: the module `{mod_dir.name}` already exists.\n")
         if not confirm():
@@ -144,8 +170,11 @@ if __name__ == "__main__":
     print(f"\nGenerating solution:")
     status("Creating module")
     mod_dir.mkdir()
-    with open(mod_dir.joinpath("mod.rs"), "w") as f:
-        f.write(SOLUTION_TEMPLATE.format(day=day, title=f": {title}" if title else ""))
+    mod_dir.joinpath("mod.rs").write_text(
+        render(day, f": {title}" if title else ""),
+        encoding="utf-8",
+        newline="\n",
+    )
 
     status("Updating main.rs")
     update_file(
@@ -156,12 +185,19 @@ if __name__ == "__main__":
     )
 
     status("Updating solutions module")
-    with open(solution_mod, "a+") as f:
-        f.write(f"pub mod {mod_name};\n")
+    fd = os.open(solution_mod, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        os.write(fd, f"pub mod {mod_name};\n".encode("utf-8"))
+    finally:
+        os.close(fd)
 
     if not args.no_fmt:
         status("Running `cargo fmt`")
         run_command(["cargo", "fmt"])
 
     print("\nSolution successfully created!")
-    print(f"\nRemember to add the problem text to `{mod_name}.rs`.\n")
+    print(f"\nRemember to add the problem text to `{mod_name}/mod.rs`.\n")
+
+
+if __name__ == "__main__":
+    main()